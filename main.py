@@ -3,10 +3,17 @@
 """
 import asyncio
 import signal
+from contextlib import asynccontextmanager, suppress
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from collections import deque
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # Windows 等平台没有 uvloop，使用默认事件循环
+
 # 导入自定义模块
 from src.utils.config import APP_CONFIG, NEWS_CONFIG, BACKPRESSURE_CONFIG
 from src.core.backpressure_controller import BackpressureController
@@ -19,17 +26,20 @@ from src.api.routes import setup_routes
 class NewsAggregatorApp:
     """实时新闻聚合应用主类"""
     
-    def __init__(self):
+    def __init__(self, lifespan=None):
         # 创建FastAPI应用
         self.app = FastAPI(
             title=APP_CONFIG['title'],
-            version=APP_CONFIG['version']
+            version=APP_CONFIG['version'],
+            default_response_class=ORJSONResponse,
+            lifespan=lifespan
         )
+        self.app.state.news_app = self
         
         # 初始化核心组件
         self.backpressure_controller = BackpressureController()
         self.news_processor = ProtectedNewsProcessor()
-        self.ws_manager = WebSocketManager()
+        self.ws_manager = WebSocketManager(self.backpressure_controller)
         self.news_buffer = deque(maxlen=NEWS_CONFIG['buffer_size'])
         
         # 初始化服务组件
@@ -46,7 +56,11 @@ class NewsAggregatorApp:
     
     async def start_news_stream(self):
         """启动新闻流生成任务"""
-        await self.news_generator.generate_protected_news_stream()
+        clock_task = asyncio.create_task(self.news_processor.clock.run())
+        try:
+            await self.news_generator.generate_protected_news_stream()
+        finally:
+            clock_task.cancel()
     
     def setup_signal_handlers(self):
         """设置信号处理器"""
@@ -68,6 +82,7 @@ class NewsAggregatorApp:
         # 启动新闻流生成任务
         asyncio.create_task(self.start_news_stream())
         
+        print(f"⚡ 事件循环: {type(asyncio.get_running_loop()).__module__}")
         print("🌐 启动FastAPI服务器...")
         print("📱 访问 http://localhost:8000 查看Web界面")
         print("📊 访问 http://localhost:8000/api/news 获取新闻API")
@@ -81,12 +96,48 @@ class NewsAggregatorApp:
             self.app,
             host=APP_CONFIG['host'],
             port=APP_CONFIG['port'],
-            log_level=APP_CONFIG['log_level']
+            log_level=APP_CONFIG['log_level'],
+            ws_per_message_deflate=APP_CONFIG['ws_per_message_deflate']
         )
         server = uvicorn.Server(config)
         await server.serve()
 
 
+@asynccontextmanager
+async def worker_lifespan(app: FastAPI):
+    """worker 进程的生命周期 - 启动时开始新闻流，关闭时停止新闻流、时钟、广播和内存采样任务"""
+    news_app = app.state.news_app
+    stream_task = asyncio.create_task(news_app.start_news_stream())
+    try:
+        yield
+    finally:
+        # 取消新闻流任务，start_news_stream 的 finally 会随之取消时钟任务
+        stream_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await stream_task
+        news_app.news_generator.stop_broadcaster()
+        news_app.backpressure_controller.stop_rss_sampler()
+
+
+def create_app() -> FastAPI:
+    """应用工厂 - 多 worker 模式下每个进程各自创建应用和新闻流"""
+    return NewsAggregatorApp(lifespan=worker_lifespan).app
+
+
+def run_workers():
+    """以多个 uvicorn worker 进程运行，每个进程管理自己的 WebSocket 客户端"""
+    print(f"🚀 以 {APP_CONFIG['workers']} 个 worker 进程启动实时技术新闻聚合器...")
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        host=APP_CONFIG['host'],
+        port=APP_CONFIG['port'],
+        workers=APP_CONFIG['workers'],
+        log_level=APP_CONFIG['log_level'],
+        ws_per_message_deflate=APP_CONFIG['ws_per_message_deflate']
+    )
+
+
 async def main():
     """主函数"""
     app = NewsAggregatorApp()
@@ -94,4 +145,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if APP_CONFIG['workers'] > 1:
+        run_workers()
+    else:
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(main())
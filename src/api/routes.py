@@ -1,10 +1,13 @@
 """
 API路由模块
 """
+import time
+import orjson
+from itertools import islice
 from fastapi import FastAPI, WebSocket
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from src.core.websocket_manager import WebSocketEndpoint
-from src.utils.config import APP_CONFIG
+from src.utils.config import APP_CONFIG, NEWS_CONFIG
 
 
 def create_html_page() -> str:
@@ -81,8 +84,47 @@ def create_html_page() -> str:
             let messageCount = 0;
             let lastStatsTime = Date.now();
             
+            function renderNews(item) {
+                // 添加新闻到页面（限制显示数量）
+                if (newsContainer.children.length > 20) {
+                    newsContainer.removeChild(newsContainer.lastChild);
+                }
+                
+                const newsDiv = document.createElement('div');
+                newsDiv.className = 'news-item';
+                
+                if (item.impact_score >= 7) {
+                    newsDiv.className += ' impact-high';
+                } else if (item.impact_score >= 4) {
+                    newsDiv.className += ' impact-medium';
+                } else {
+                    newsDiv.className += ' impact-low';
+                }
+                
+                newsDiv.innerHTML = `
+                    <div class="news-title">${item.title}</div>
+                    <div class="news-meta">
+                        📰 ${item.source} | 🏷️ ${item.category} | 🏢 ${item.company} | ⭐ ${item.impact_score}/10
+                    </div>
+                `;
+                
+                newsContainer.insertBefore(newsDiv, newsContainer.firstChild);
+            }
+            
             ws.onmessage = function(event) {
                 const data = JSON.parse(event.data);
+                
+                if (data.type === 'news_batch') {
+                    // 列式批量帧：按列名还原新闻，页面只需渲染最后能显示的部分
+                    messageCount += data.rows.length;
+                    data.rows.slice(-21).forEach(row => {
+                        const item = {};
+                        data.cols.forEach((col, i) => { item[col] = row[i]; });
+                        renderNews(item);
+                    });
+                    return;
+                }
+                
                 messageCount++;
                 
                 if (data.type === 'statistics') {
@@ -124,30 +166,7 @@ def create_html_page() -> str:
                     messageCount = 0;
                     lastStatsTime = now;
                 } else {
-                    // 添加新闻到页面（限制显示数量）
-                    if (newsContainer.children.length > 20) {
-                        newsContainer.removeChild(newsContainer.lastChild);
-                    }
-                    
-                    const newsDiv = document.createElement('div');
-                    newsDiv.className = 'news-item';
-                    
-                    if (data.impact_score >= 7) {
-                        newsDiv.className += ' impact-high';
-                    } else if (data.impact_score >= 4) {
-                        newsDiv.className += ' impact-medium';
-                    } else {
-                        newsDiv.className += ' impact-low';
-                    }
-                    
-                    newsDiv.innerHTML = `
-                        <div class="news-title">${data.title}</div>
-                        <div class="news-meta">
-                            📰 ${data.source} | 🏷️ ${data.category} | 🏢 ${data.company} | ⭐ ${data.impact_score}/10
-                        </div>
-                    `;
-                    
-                    newsContainer.insertBefore(newsDiv, newsContainer.firstChild);
+                    renderNews(data);
                 }
             };
             
@@ -174,17 +193,24 @@ def setup_routes(app: FastAPI, ws_endpoint: WebSocketEndpoint, news_processor, n
         """主页 - 安全版"""
         return HTMLResponse(create_html_page())
 
+    # /api/news 的已编码响应缓存，短时间内的重复请求直接复用
+    latest_news_cache = {'body': b'', 'built_at': float('-inf')}
+
     @app.get("/api/news")
     async def get_latest_news():
         """获取最新新闻API"""
-        return {
-            "news": list(news_buffer)[-10:],  # 返回最新10条
-            "statistics": news_processor.get_statistics(
-                buffer_size=len(news_buffer),
-                active_connections=0,  # 将在调用时传入
-                broadcast_stats={}  # 将在调用时传入
-            )
-        }
+        now = time.monotonic()
+        if now - latest_news_cache['built_at'] >= NEWS_CONFIG['api_news_cache_ttl']:
+            latest_news_cache['body'] = orjson.dumps({
+                "news": list(islice(reversed(news_buffer), 10))[::-1],  # 返回最新10条，只遍历队尾
+                "statistics": news_processor.get_statistics(
+                    buffer_size=len(news_buffer),
+                    active_connections=0,  # 将在调用时传入
+                    broadcast_stats={}  # 将在调用时传入
+                )
+            })
+            latest_news_cache['built_at'] = now
+        return Response(content=latest_news_cache['body'], media_type="application/json")
 
     @app.get("/api/stats")
     async def get_statistics():
@@ -5,9 +5,9 @@ import asyncio
 import time
 import os
 import psutil
-from collections import deque
 from typing import Tuple
 from src.utils.config import BACKPRESSURE_CONFIG
+from src.utils.rolling import RollingMean
 
 
 class BackpressureController:
@@ -18,14 +18,43 @@ class BackpressureController:
         self.is_paused = False
         self.pause_reason = None
         self.last_memory_check = time.time()
-        self.processing_times = deque(maxlen=100)
+        self.processing_times = RollingMean(maxlen=100)
+        # 进程对象只创建一次；RSS 由后台任务定期采样，检查时只读缓存值
+        self.process = psutil.Process(os.getpid())
+        self.rss_mb = 0.0
+        self._rss_sampler_task = None
+    
+    def _sample_rss(self):
+        """采样一次当前进程的 RSS"""
+        self.rss_mb = self.process.memory_info().rss / 1024 / 1024
+        self.last_memory_check = time.time()
+    
+    async def _rss_sampler(self):
+        """后台任务 - 每个内存检查间隔刷新一次 RSS"""
+        while True:
+            await asyncio.sleep(BACKPRESSURE_CONFIG['memory_check_interval'])
+            try:
+                self._sample_rss()
+            except Exception as e:
+                print(f"❌ 内存采样失败: {e}")
+    
+    def stop_rss_sampler(self):
+        """停止后台 RSS 采样任务，应用关闭时调用"""
+        if self._rss_sampler_task is not None:
+            self._rss_sampler_task.cancel()
+            self._rss_sampler_task = None
         
     async def check_memory_usage(self) -> bool:
         """检查内存使用情况"""
         try:
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
-            memory_mb = memory_info.rss / 1024 / 1024
+            # 采样任务未运行时（首次检查或已停止）同步采样一次，并启动后台采样任务
+            if self._rss_sampler_task is None or self._rss_sampler_task.done():
+                self._sample_rss()
+                self._rss_sampler_task = asyncio.create_task(self._rss_sampler())
+            elif self.is_paused:
+                # 暂停期间每次轮询都重新采样，gc.collect() 等释放的内存能及时反映，尽快恢复
+                self._sample_rss()
+            memory_mb = self.rss_mb
             
             if memory_mb > BACKPRESSURE_CONFIG['max_memory_usage'] / 1024 / 1024:
                 print(f"⚠️ 内存使用过高: {memory_mb:.1f}MB > {BACKPRESSURE_CONFIG['max_memory_usage']/1024/1024}MB")
@@ -40,7 +69,7 @@ class BackpressureController:
         if len(self.processing_times) < 10:
             return False
             
-        avg_processing_time = sum(self.processing_times) / len(self.processing_times)
+        avg_processing_time = self.processing_times.mean()
         
         if avg_processing_time > BACKPRESSURE_CONFIG['processing_delay_threshold']:
             print(f"⚠️ 处理延迟过高: {avg_processing_time:.3f}s > {BACKPRESSURE_CONFIG['processing_delay_threshold']}s")
@@ -92,6 +121,7 @@ class BackpressureController:
             'queue_size': self.processing_queue.qsize(),
             'is_paused': self.is_paused,
             'pause_reason': self.pause_reason,
-            'avg_processing_time': sum(self.processing_times) / len(self.processing_times) if self.processing_times else 0,
+            'avg_processing_time': self.processing_times.mean(),
+            'rss_mb': self.rss_mb,
             'memory_check_interval': BACKPRESSURE_CONFIG['memory_check_interval']
         }
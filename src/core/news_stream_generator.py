@@ -2,11 +2,12 @@
 新闻流生成器模块
 """
 import asyncio
-import json
 import sys
 import time
+import orjson
 from collections import deque
-from src.utils.config import NEWS_CONFIG, BACKPRESSURE_CONFIG
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.config import NEWS_CONFIG, BACKPRESSURE_CONFIG, WS_CONFIG
 
 
 class NewsStreamGenerator:
@@ -17,11 +18,59 @@ class NewsStreamGenerator:
         self.news_processor = news_processor
         self.ws_manager = ws_manager
         self.news_buffer = news_buffer
+        # 生产者与广播任务之间的有界队列，复用背压控制器的处理队列
+        self.broadcast_queue = backpressure_controller.processing_queue
+        self._broadcaster_task = None
+        # 批量生成和处理放到单独线程，事件循环在此期间继续发送 WebSocket 数据
+        # 只用一个线程，保证处理器的计数和 processing_id 顺序不变；随新闻流启动和关闭
+        self._executor = None
+    
+    def _ensure_broadcaster(self):
+        """确保广播任务在运行"""
+        if self._broadcaster_task is None or self._broadcaster_task.done():
+            self._broadcaster_task = asyncio.create_task(self._broadcaster())
+    
+    def stop_broadcaster(self):
+        """停止广播任务，应用关闭时调用"""
+        if self._broadcaster_task is not None:
+            self._broadcaster_task.cancel()
+            self._broadcaster_task = None
+    
+    async def _broadcaster(self):
+        """广播任务 - 取出一条后顺带取走已排队的新闻，合并为一帧推送"""
+        queue = self.broadcast_queue
+        max_batch = WS_CONFIG['broadcast_batch_size']
+        while True:
+            news_items = [await queue.get()]
+            while len(news_items) < max_batch and not queue.empty():
+                news_items.append(queue.get_nowait())
+            try:
+                await self.ws_manager.broadcast_news_batch(news_items)
+            except Exception as e:
+                print(f"❌ 广播任务错误: {e}")
+    
+    def _enqueue_broadcast(self, news_item):
+        """将新闻放入广播队列，队列满时丢弃最旧的一条"""
+        if not self.ws_manager.active_connections:
+            return
+        
+        try:
+            self.broadcast_queue.put_nowait(news_item)
+        except asyncio.QueueFull:
+            self.broadcast_queue.get_nowait()
+            self.broadcast_queue.put_nowait(news_item)
+            self.ws_manager.broadcast_stats['backpressure_events'] += 1
+    
+    @staticmethod
+    def _build_batch(generate_batch, process_news_batch, count):
+        """在工作线程中生成并处理一批新闻，返回通过处理的条目"""
+        return process_news_batch(generate_batch(count))
     
     async def generate_protected_news_stream(self):
         """生成受保护的新闻流"""
         try:
             print("📡 启动受保护的新闻生成器...")
+            self._ensure_broadcaster()
             
             # 尝试导入高频新闻生成器
             try:
@@ -33,56 +82,75 @@ class NewsStreamGenerator:
             
             duration = NEWS_CONFIG['test_duration']
             news_per_second = NEWS_CONFIG['news_per_second']
+            batch_size = NEWS_CONFIG['batch_size']
+            progress_interval = NEWS_CONFIG['progress_report_interval']
+            
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-gen")
+            
+            # 热循环中用到的方法预先绑定为局部变量
+            loop = asyncio.get_running_loop()
+            build_batch = self._build_batch
+            generate_batch = generator.generate_batch
+            process_news_batch = self.news_processor.process_news_batch
+            enqueue_broadcast = self._enqueue_broadcast
+            news_buffer = self.news_buffer
             
-            start_time = time.time()
+            start_time = time.monotonic()
+            end_time = start_time + duration
             total_generated = 0
             stats_counter = 0
-            memory_check_counter = 0
+            next_stats_at = 0.0
+            next_progress = progress_interval
+            next_memory_check = start_time + BACKPRESSURE_CONFIG['memory_check_interval']
             
-            while time.time() - start_time < duration:
-                second_start = time.time()
-                
+            # 按单调时钟的截止时间逐批生成，每批之后等到该批的计划时间点
+            # 新闻均匀分布在整秒内，而不是每秒开头集中生成一波再整段休眠
+            # 计划时间点按 起点 + 批次数 * 批间隔 计算，不累加浮点误差
+            batch_interval = batch_size / news_per_second
+            schedule_start = start_time
+            scheduled_batches = 0
+            
+            while schedule_start + scheduled_batches * batch_interval < end_time:
                 # 检查背压状态 - 使用统一的等待逻辑
                 if self.backpressure_controller.is_paused:
                     print(f"⏸️ 处理已暂停: {self.backpressure_controller.pause_reason}")
                     await self.backpressure_controller.wait_for_resume()
+                    # 暂停期间的欠量不补发，从恢复时刻重新计时
+                    schedule_start = time.monotonic()
+                    scheduled_batches = 0
                 
-                # 每秒生成指定数量的新闻
-                for i in range(news_per_second):
-                    # 检查背压
-                    if self.backpressure_controller.is_paused:
-                        break
-                    
-                    news_item = generator.generate_news_item()
-                    processed_news = self.news_processor.process_news(news_item)
-                    
-                    if processed_news:
-                        # 添加到缓冲区
-                        self.news_buffer.append(processed_news)
-                        total_generated += 1
-                        
-                        # 安全的广播
-                        await self.ws_manager.broadcast_news(processed_news, self.backpressure_controller)
-                        
-                        # 定期广播统计信息
-                        if processed_news['processing_id'] % NEWS_CONFIG['stats_broadcast_interval'] == 0:
-                            stats = self.news_processor.get_statistics(
-                                buffer_size=len(self.news_buffer),
-                                active_connections=len(self.ws_manager.active_connections),
-                                broadcast_stats=self.ws_manager.broadcast_stats
-                            )
-                            await self.ws_manager.broadcast_statistics(stats)
-                            stats_counter += 1
-                        
-                        # 定期打印进度
-                        if processed_news['processing_id'] % NEWS_CONFIG['progress_report_interval'] == 0:
-                            elapsed = time.time() - start_time
-                            rate = total_generated / elapsed
-                            print(f"📰 已生成 {total_generated} 条新闻，速率: {rate:.2f}条/秒，统计广播: {stats_counter} 次")
+                batch = await loop.run_in_executor(
+                    self._executor, build_batch, generate_batch, process_news_batch, batch_size
+                )
+                news_buffer.extend(batch)
+                total_generated += len(batch)
+                
+                # 交给广播任务，不阻塞生成
+                for news in batch:
+                    enqueue_broadcast(news)
+                
+                now = time.monotonic()
+                
+                # 每批至多广播一次统计信息，且受最小间隔限制
+                if self.ws_manager.active_connections and now >= next_stats_at:
+                    next_stats_at = now + NEWS_CONFIG['stats_broadcast_min_interval']
+                    stats = self.news_processor.get_statistics(
+                        buffer_size=len(news_buffer),
+                        active_connections=len(self.ws_manager.active_connections),
+                        broadcast_stats=self.ws_manager.broadcast_stats
+                    )
+                    await self.ws_manager.broadcast_statistics(stats)
+                    stats_counter += 1
+                
+                # 定期打印进度
+                if total_generated >= next_progress:
+                    next_progress += progress_interval
+                    rate = total_generated / (now - start_time)
+                    print(f"📰 已生成 {total_generated} 条新闻，速率: {rate:.2f}条/秒，统计广播: {stats_counter} 次")
                 
                 # 定期检查内存使用
-                memory_check_counter += 1
-                if memory_check_counter % BACKPRESSURE_CONFIG['memory_check_interval'] == 0:
+                if now >= next_memory_check:
+                    next_memory_check = now + BACKPRESSURE_CONFIG['memory_check_interval']
                     memory_high = await self.backpressure_controller.check_memory_usage()
                     if memory_high:
                         await self.backpressure_controller.pause_processing("内存使用过高")
@@ -90,12 +158,13 @@ class NewsStreamGenerator:
                         import gc
                         gc.collect()
                 
-                # 控制每秒的时间
-                second_elapsed = time.time() - second_start
-                if second_elapsed < 1.0:
-                    await asyncio.sleep(1.0 - second_elapsed)
+                # 等到本批的计划时间点；落后时不休眠，直接生成下一批追上进度
+                scheduled_batches += 1
+                delay = schedule_start + scheduled_batches * batch_interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
             
-            total_time = time.time() - start_time
+            total_time = time.monotonic() - start_time
             actual_rate = total_generated / total_time
             
             print(f"✅ 受保护新闻生成完成！")
@@ -109,11 +178,16 @@ class NewsStreamGenerator:
             
         except Exception as e:
             print(f"❌ Error generating news stream: {e}")
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
 
     async def safe_read_news_stream(self):
         """安全读取新闻流 - 带背压控制"""
         try:
             print("📡 启动安全新闻流读取器...")
+            self._ensure_broadcaster()
             
             # 启动 mock_stream.py 作为子进程
             process = await asyncio.create_subprocess_exec(
@@ -127,6 +201,8 @@ class NewsStreamGenerator:
             
             print("📡 安全流读取器已启动")
             
+            next_stats_at = 0.0
+            
             while True:
                 # 安全读取一行
                 line = await reader.read_line_safe(process.stdout)
@@ -141,30 +217,29 @@ class NewsStreamGenerator:
                 # 处理有效的JSON行
                 if line and line.startswith('{'):
                     try:
-                        news_item = json.loads(line)
+                        news_item = orjson.loads(line)
                         processed_news = self.news_processor.process_news(news_item)
                         
                         if processed_news:
                             # 添加到缓冲区
                             self.news_buffer.append(processed_news)
                             
-                            # 安全广播
-                            await self.ws_manager.broadcast_news(processed_news, self.backpressure_controller)
+                            # 交给广播任务，不阻塞读取
+                            self._enqueue_broadcast(processed_news)
                             
-                            # 定期广播统计信息
-                            if processed_news['processing_id'] % 10 == 0:
+                            # 定期广播统计信息 - 合并为每个最小间隔至多一次
+                            if (processed_news['processing_id'] % 10 == 0
+                                    and self.ws_manager.active_connections
+                                    and time.monotonic() >= next_stats_at):
+                                next_stats_at = time.monotonic() + NEWS_CONFIG['stats_broadcast_min_interval']
                                 stats = self.news_processor.get_statistics(
                                     buffer_size=len(self.news_buffer),
                                     active_connections=len(self.ws_manager.active_connections),
                                     broadcast_stats=self.ws_manager.broadcast_stats
                                 )
                                 await self.ws_manager.broadcast_statistics(stats)
-                            
-                            # 打印进度
-                            if processed_news['processing_id'] % 100 == 0:
-                                print(f"📰 处理新闻 [{processed_news['processing_id']}] {processed_news['title'][:50]}...")
                                 
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         continue
                         
                 # 定期打印读取统计
@@ -205,5 +280,8 @@ class NewsStreamGenerator:
                     "impact_score": round(random.uniform(1.0, 10.0), 2),
                     "url": f"https://example.com/news/{self.counter}"
                 }
+            
+            def generate_batch(self, n):
+                return [self.generate_news_item() for _ in range(n)]
         
         return SimpleGenerator()
@@ -1,12 +1,13 @@
 """
 新闻处理器模块
 """
-import json
 import time
-from datetime import datetime
-from collections import deque
+import orjson
+from collections import Counter
 from typing import Dict, Any, Optional, List
 from src.utils.config import NEWS_CONFIG, BACKPRESSURE_CONFIG
+from src.utils.clock import CoarseClock
+from src.utils.rolling import RollingMean
 
 
 class ProtectedNewsProcessor:
@@ -14,14 +15,17 @@ class ProtectedNewsProcessor:
     
     def __init__(self):
         self.processed_count = 0
-        self.categories_count = {}
-        self.processing_times = deque(maxlen=100)
+        self.categories_count = Counter()
+        self.processing_times = RollingMean(maxlen=100)  # 最近 100 个采样的处理时间
         self.rejected_count = 0
+        # 处理时间戳取自低精度时钟，由新闻流任务负责刷新
+        self.clock = CoarseClock()
+        # 统计快照缓存，仅在处理状态变化后重建
+        self._stats_dirty = True
+        self._stats_snapshot = {}
         
-    def process_news(self, news_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """处理新闻数据 - 带验证和大小限制"""
-        start_time = time.time()
-        
+    def _validate(self, news_item: Dict[str, Any]) -> bool:
+        """验证必要字段和数据大小，不通过时计入拒绝数"""
         try:
             # 验证必要字段
             required_fields = ['title', 'source', 'category', 'company']
@@ -29,46 +33,101 @@ class ProtectedNewsProcessor:
                 if field not in news_item or not news_item[field]:
                     print(f"⚠️ 缺少必要字段: {field}")
                     self.rejected_count += 1
-                    return None
+                    return False
             
             # 检查数据大小
-            json_size = len(json.dumps(news_item))
+            json_size = len(orjson.dumps(news_item))
             if json_size > 100 * 1024:  # 100KB 限制
                 print(f"⚠️ 新闻数据过大: {json_size} bytes")
                 self.rejected_count += 1
-                return None
-            
-            self.processed_count += 1
-            
-            # 统计分类
-            category = news_item.get('category', 'Unknown')
-            self.categories_count[category] = self.categories_count.get(category, 0) + 1
+                return False
             
-            # 添加处理时间戳
-            news_item['processed_at'] = datetime.now().isoformat()
-            news_item['processing_id'] = self.processed_count
-            
-            # 记录处理时间
-            processing_time = time.time() - start_time
-            self.processing_times.append(processing_time)
-            
-            return news_item
+            return True
             
         except Exception as e:
             print(f"❌ 新闻处理错误: {e}")
             self.rejected_count += 1
+            return False
+    
+    def process_news(self, news_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """处理新闻数据 - 带验证和大小限制"""
+        # 每 128 条只采样一次处理耗时，避免计时本身占据热路径
+        sampled = (self.processed_count & 0x7F) == 0
+        if sampled:
+            start_time = time.perf_counter()
+        
+        if not self._validate(news_item):
+            self._stats_dirty = True
             return None
+        
+        self.processed_count += 1
+        
+        # 统计分类
+        category = news_item.get('category', 'Unknown')
+        self.categories_count[category] += 1
+        
+        # 添加处理时间戳
+        news_item['processed_at'] = self.clock.now_iso
+        news_item['processing_id'] = self.processed_count
+        
+        # 记录处理时间（仅采样的条目）
+        if sampled:
+            self.processing_times.append(time.perf_counter() - start_time)
+        
+        # 所有计数更新完成后再标记统计失效，见 get_statistics
+        self._stats_dirty = True
+        return news_item
+    
+    def process_news_batch(self, news_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量处理新闻 - 逐条验证，分类计数一次性更新，返回通过处理的条目
+        
+        可在工作线程中调用；统计失效标记在所有计数更新完成后才设置
+        """
+        start_time = time.perf_counter()
+        
+        accepted = [news_item for news_item in news_items if self._validate(news_item)]
+        if not accepted:
+            self._stats_dirty = True
+            return accepted
+        
+        # 添加处理时间戳，整批共用同一个时间
+        now_iso = self.clock.now_iso
+        processing_id = self.processed_count
+        for news_item in accepted:
+            processing_id += 1
+            news_item['processed_at'] = now_iso
+            news_item['processing_id'] = processing_id
+        self.processed_count = processing_id
+        
+        # 统计分类
+        self.categories_count.update(news_item.get('category', 'Unknown') for news_item in accepted)
+        
+        # 整批计时一次，按条目平均后记为一个样本
+        self.processing_times.append((time.perf_counter() - start_time) / len(accepted))
+        
+        self._stats_dirty = True
+        return accepted
     
     def get_statistics(self, buffer_size: int = 0, active_connections: int = 0, broadcast_stats: dict = None) -> Dict[str, Any]:
         """获取处理统计信息"""
-        avg_processing_time = sum(self.processing_times) / len(self.processing_times) if self.processing_times else 0
+        if self._stats_dirty:
+            # 先清除标记再读取计数：构建快照期间工作线程完成的更新会重新设置标记，下次读取时重建
+            self._stats_dirty = False
+            avg_processing_time = self.processing_times.mean()
+            self._stats_snapshot = {
+                "total_processed": self.processed_count,
+                "rejected_count": self.rejected_count,
+                "categories_distribution": dict(self.categories_count),
+                "avg_processing_time_ms": round(avg_processing_time * 1000, 2)
+            }
         
+        snapshot = self._stats_snapshot
         return {
-            "total_processed": self.processed_count,
-            "rejected_count": self.rejected_count,
-            "categories_distribution": dict(self.categories_count),
+            "total_processed": snapshot["total_processed"],
+            "rejected_count": snapshot["rejected_count"],
+            "categories_distribution": snapshot["categories_distribution"],
             "buffer_size": buffer_size,
-            "avg_processing_time_ms": round(avg_processing_time * 1000, 2),
+            "avg_processing_time_ms": snapshot["avg_processing_time_ms"],
             "active_connections": active_connections,
             "broadcast_stats": broadcast_stats or {}
         }
@@ -112,7 +171,7 @@ class SafeStreamReader:
                 
                 # 验证JSON格式
                 if line_str and line_str.startswith('{'):
-                    json.loads(line_str)  # 验证JSON有效性
+                    orjson.loads(line_str)  # 验证JSON有效性
                 
                 self.lines_processed += 1
                 self.bytes_processed += line_size
@@ -123,7 +182,7 @@ class SafeStreamReader:
                 print(f"⚠️ 编码错误: {e}")
                 self.errors_count += 1
                 return None
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 print(f"⚠️ JSON解析错误: {e}")
                 self.errors_count += 1
                 return None
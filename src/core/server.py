@@ -1,24 +1,39 @@
-import json
 import asyncio
+import orjson
 import time
-from typing import Dict, Any, List
-from datetime import datetime
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from typing import Dict, Any, Optional, Set, Tuple
+import gzip
+import hashlib
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import ORJSONResponse, Response
 import uvicorn
 from collections import deque
+from src.utils.rolling import RollingMean
 
-app = FastAPI(title="持续优化版 - 实时技术新闻聚合器", version="2.2.0")
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-active_connections: List[WebSocket] = []
-news_buffer = deque(maxlen=1000)
+app = FastAPI(title="持续优化版 - 实时技术新闻聚合器", version="2.2.0", default_response_class=ORJSONResponse)
+
+active_connections: Set[WebSocket] = set()
+# 每个连接独立的发送队列，由各自的 relay 任务发送，慢客户端只会拖慢自己
+client_queues: Dict[WebSocket, asyncio.Queue] = {}
+news_buffer = deque(maxlen=50)  # 只需保留少量最近新闻
 broadcast_buffer = []
-last_broadcast_time = time.time()
+# 生成与广播之间的有界队列，满时丢弃最旧的新闻
+news_queue: asyncio.Queue = asyncio.Queue(maxsize=2048)
+BROADCAST_BATCH_SIZE = 64  # 每帧最多合并的新闻数，负载越高批越大
+SEND_TIMEOUT = 2.0  # 单次发送超时(秒)，超时视为连接已失效
+CLIENT_QUEUE_SIZE = 256  # 每个连接最多排队的消息数，满时丢弃最旧的
+GENERATE_BATCH_SIZE = 50  # 生成器每批条数，批与批之间按计划时间点休眠
 
 broadcast_stats = {
     'total_sent': 0,
     'total_errors': 0,
     'batch_count': 0,
+    'total_dropped': 0,
     'start_time': time.time()
 }
 
@@ -26,29 +41,52 @@ class ContinuousOptimizedNewsProcessor:
     def __init__(self):
         self.processed_count = 0
         self.categories_count = {}
-        self.processing_times = deque(maxlen=100)
+        self.processing_times = RollingMean(maxlen=100)
+        self._categories_snapshot = None
+        # 分类名映射为小整数 id，推送的新闻只带 id，名称表随统计消息下发
+        self.category_ids: Dict[str, int] = {}
+        self.category_names = []
+        # 已编码的统计消息缓存，处理新数据或连接变化后重建
+        self._stats_dirty = True
+        self._stats_message = ""
         
-    def process_news(self, news_item: Dict[str, Any]) -> Dict[str, Any]:
-        start_time = time.time()
+    def process_news(self, news_item: Dict[str, Any], now_ms: Optional[int] = None) -> Dict[str, Any]:
+        # 每 64 条只采样一次处理耗时，避免计时本身占据热路径
+        sampled = (self.processed_count & 0x3F) == 0
+        if sampled:
+            start_time = time.perf_counter()
         self.processed_count += 1
+        self._stats_dirty = True
         
-        category = news_item.get('category', 'Unknown')
+        category = news_item.pop('category', 'Unknown')
         self.categories_count[category] = self.categories_count.get(category, 0) + 1
+        self._categories_snapshot = None
+        
+        category_id = self.category_ids.get(category)
+        if category_id is None:
+            category_id = self.category_ids[category] = len(self.category_names)
+            self.category_names.append(category)
+        news_item['cat'] = category_id
+        news_item['impact_score'] = round(news_item['impact_score'])
         
-        news_item['processed_at'] = datetime.now().isoformat()
+        news_item['processed_at_ms'] = now_ms if now_ms is not None else time.time_ns() // 1_000_000
         news_item['processing_id'] = self.processed_count
         
-        processing_time = time.time() - start_time
-        self.processing_times.append(processing_time)
+        # 记录处理时间（仅采样的条目）
+        if sampled:
+            self.processing_times.append(time.perf_counter() - start_time)
         
         return news_item
     
     def get_statistics(self) -> Dict[str, Any]:
-        avg_processing_time = sum(self.processing_times) / len(self.processing_times) if self.processing_times else 0
+        avg_processing_time = self.processing_times.mean()
+        if self._categories_snapshot is None:
+            self._categories_snapshot = dict(self.categories_count)
         
         return {
             "total_processed": self.processed_count,
-            "categories_distribution": dict(self.categories_count),
+            "categories_distribution": self._categories_snapshot,
+            "categories": self.category_names,
             "buffer_size": len(news_buffer),
             "avg_processing_time_ms": round(avg_processing_time * 1000, 2),
             "active_connections": len(active_connections),
@@ -56,22 +94,51 @@ class ContinuousOptimizedNewsProcessor:
                 "total_sent": broadcast_stats['total_sent'],
                 "total_errors": broadcast_stats['total_errors'],
                 "batch_count": broadcast_stats['batch_count'],
+                "total_dropped": broadcast_stats['total_dropped'],
                 "avg_batch_size": broadcast_stats['total_sent'] / max(broadcast_stats['batch_count'], 1),
                 "uptime_seconds": time.time() - broadcast_stats['start_time']
             }
         }
+    
+    def invalidate_statistics(self):
+        """标记统计消息缓存失效，连接数等外部状态变化时调用"""
+        self._stats_dirty = True
+    
+    def get_statistics_message(self) -> str:
+        """获取已编码的统计消息，状态未变化时直接复用"""
+        if self._stats_dirty:
+            self._stats_message = orjson.dumps({
+                "type": "statistics",
+                "data": self.get_statistics()
+            }).decode()
+            self._stats_dirty = False
+        return self._stats_message
 
 news_processor = ContinuousOptimizedNewsProcessor()
 
-async def optimized_broadcast_news(news_item: Dict[str, Any]):
-    global broadcast_buffer, last_broadcast_time
-    
-    broadcast_buffer.append(news_item)
-    current_time = time.time()
+def enqueue_broadcast(news_item: Dict[str, Any]):
+    """将新闻放入广播队列，不阻塞生成"""
+    if not active_connections:
+        return
     
-    if len(broadcast_buffer) >= 5 or current_time - last_broadcast_time > 0.2:
-        await flush_broadcast_buffer()
-        last_broadcast_time = current_time
+    try:
+        news_queue.put_nowait(news_item)
+    except asyncio.QueueFull:
+        news_queue.get_nowait()
+        news_queue.put_nowait(news_item)
+
+async def broadcaster():
+    """广播任务 - 取出一条后顺带取走已排队的新闻，攒成一批推送"""
+    while True:
+        broadcast_buffer.append(await news_queue.get())
+        while len(broadcast_buffer) < BROADCAST_BATCH_SIZE and not news_queue.empty():
+            broadcast_buffer.append(news_queue.get_nowait())
+        
+        try:
+            await flush_broadcast_buffer()
+        except Exception as e:
+            print(f"❌ 广播任务错误: {e}")
+            broadcast_buffer.clear()
 
 async def flush_broadcast_buffer():
     global broadcast_buffer, broadcast_stats
@@ -79,110 +146,122 @@ async def flush_broadcast_buffer():
     if not broadcast_buffer or not active_connections:
         return
     
-    start_time = time.time()
-    batch_size = len(broadcast_buffer)
+    # 整批新闻合并为一个 JSON 数组帧，每个连接只入队一次
+    message = orjson.dumps(broadcast_buffer).decode()
     
-    tasks = []
-    for connection in active_connections:
-        for news_item in broadcast_buffer:
-            tasks.append(send_safe(connection, news_item))
-    
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    errors = sum(1 for result in results if isinstance(result, Exception))
-    success_count = len(tasks) - errors
-    
-    broadcast_stats['total_sent'] += success_count
-    broadcast_stats['total_errors'] += errors
+    fan_out(message, len(broadcast_buffer))
     broadcast_stats['batch_count'] += 1
     
-    broadcast_time = time.time() - start_time
-    
-    print(f"📡 批量广播 {batch_size} 条到 {len(active_connections)} 客户端，耗时 {broadcast_time:.3f}s")
-    
     broadcast_buffer.clear()
 
-async def send_safe(websocket: WebSocket, news_item: Dict[str, Any]):
-    try:
-        message = json.dumps(news_item, ensure_ascii=False)
-        await websocket.send_text(message)
-    except Exception as e:
-        return e
-    return None
+async def relay(websocket: WebSocket, queue: asyncio.Queue):
+    """连接的发送任务 - 依次发送队列中的消息，送达后按新闻条数计入 total_sent"""
+    while True:
+        message, item_count = await queue.get()
+        try:
+            await asyncio.wait_for(websocket.send_text(message), timeout=SEND_TIMEOUT)
+        except Exception:
+            # 发送超时或失败：关闭连接，端点的接收循环随之结束，不留下收不到推送的僵尸连接
+            broadcast_stats['total_errors'] += 1
+            try:
+                await websocket.close(code=1011)
+            except Exception:
+                pass
+            break
+        broadcast_stats['total_sent'] += item_count
+    
+    # 发送失败的连接不再接收广播
+    active_connections.discard(websocket)
+    client_queues.pop(websocket, None)
+    news_processor.invalidate_statistics()
+
+def fan_out(message: str, item_count: int = 1) -> Tuple[int, int]:
+    """把同一条消息放入所有连接的发送队列，返回 (入队数, 丢弃数)"""
+    entry = (message, item_count)
+    dropped = 0
+    for queue in client_queues.values():
+        try:
+            queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # 客户端跟不上，丢弃最旧的一条
+            queue.get_nowait()
+            queue.put_nowait(entry)
+            dropped += 1
+    broadcast_stats['total_dropped'] += dropped
+    return len(client_queues), dropped
 
 async def continuous_news_generator(news_per_second: int = 500):
     """持续新闻生成器"""
     print(f"📡 启动持续新闻生成器: {news_per_second}条/秒")
     
-    from high_freq_news import HighFreqNewsGenerator
+    from src.generators.high_frequency_news import HighFreqNewsGenerator
     generator = HighFreqNewsGenerator()
     
     stats_counter = 0
     
+    # 按单调时钟的计划时间点逐批生成，新闻均匀分布在整秒内而不是集中在开头
+    batch_interval = GENERATE_BATCH_SIZE / news_per_second
+    start_time = time.monotonic()
+    scheduled_batches = 0
+    
     while True:
-        second_start = time.time()
-        
-        for i in range(news_per_second):
-            news_item = generator.generate_news_item()
-            processed_news = news_processor.process_news(news_item)
+        # 整批一次采样随机字段，同批新闻共用一次时间戳读取
+        now_ms = time.time_ns() // 1_000_000
+        for news_item in generator.generate_batch(GENERATE_BATCH_SIZE):
+            processed_news = news_processor.process_news(news_item, now_ms)
             
             news_buffer.append(processed_news)
             
             if processed_news['processing_id'] % 5 == 0:
-                await optimized_broadcast_news(processed_news)
+                enqueue_broadcast(processed_news)
             
             if processed_news['processing_id'] % 50 == 0:
-                await optimized_broadcast_statistics()
+                optimized_broadcast_statistics()
                 stats_counter += 1
             
             if processed_news['processing_id'] % 500 == 0:
-                elapsed = time.time() - (second_start - (processed_news['processing_id'] // news_per_second))
-                rate = processed_news['processing_id'] / max(elapsed, 1)
+                rate = processed_news['processing_id'] / max(time.monotonic() - start_time, 1)
                 print(f"📰 已生成 {processed_news['processing_id']} 条，速率: {rate:.2f}条/秒")
         
-        second_elapsed = time.time() - second_start
-        if second_elapsed < 1.0:
-            await asyncio.sleep(1.0 - second_elapsed)
+        # 等到本批的计划时间点；落后时不休眠直接追赶，但每批仍让出一次事件循环，广播和发送任务不被饿死
+        scheduled_batches += 1
+        delay = start_time + scheduled_batches * batch_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
 
-async def optimized_broadcast_statistics():
-    stats_message = {
-        "type": "statistics",
-        "data": news_processor.get_statistics()
-    }
-    
+def optimized_broadcast_statistics():
     if active_connections:
-        tasks = []
-        for connection in active_connections:
-            tasks.append(send_safe(connection, stats_message))
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        errors = sum(1 for result in results if isinstance(result, Exception))
-        
-        broadcast_stats['total_sent'] += (len(tasks) - errors)
-        broadcast_stats['total_errors'] += errors
+        fan_out(news_processor.get_statistics_message())
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_connections.append(websocket)
+    queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    client_queues[websocket] = queue
+    active_connections.add(websocket)
+    relay_task = asyncio.create_task(relay(websocket, queue))
+    news_processor.invalidate_statistics()
     print(f"🔌 新连接，当前: {len(active_connections)}")
     
     try:
-        await optimized_broadcast_statistics()
+        optimized_broadcast_statistics()
         
-        while True:
-            await websocket.receive_text()
+        # 保持连接，客户端断开时迭代自然结束
+        async for _ in websocket.iter_text():
+            pass
             
-    except WebSocketDisconnect:
-        active_connections.remove(websocket)
-        print(f"🔌 断开，当前: {len(active_connections)}")
     except Exception as e:
         print(f"❌ WebSocket错误: {e}")
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+    finally:
+        active_connections.discard(websocket)
+        client_queues.pop(websocket, None)
+        relay_task.cancel()
+        news_processor.invalidate_statistics()
+        print(f"🔌 断开，当前: {len(active_connections)}")
 
-@app.get("/")
-async def get():
-    return HTMLResponse("""
+INDEX_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -221,13 +300,37 @@ async def get():
             const ws = new WebSocket('ws://localhost:8000/ws');
             const newsContainer = document.getElementById('news-container');
             let messageCount = 0;
+            let categoryNames = [];
+            
+            function renderNews(item) {
+                if (newsContainer.children.length > 20) {
+                    newsContainer.removeChild(newsContainer.lastChild);
+                }
+                
+                const newsDiv = document.createElement('div');
+                newsDiv.className = 'news-item';
+                newsDiv.innerHTML = `
+                    <div><strong>${item.title}</strong></div>
+                    <div style="color: #7f8c8d; font-size: 14px;">
+                        ${item.source} | ${categoryNames[item.cat] ?? item.cat} | ⭐ ${item.impact_score}/10
+                    </div>
+                `;
+                
+                newsContainer.insertBefore(newsDiv, newsContainer.firstChild);
+            }
             
             ws.onmessage = function(event) {
                 const data = JSON.parse(event.data);
                 messageCount++;
                 
-                if (data.type === 'statistics') {
+                if (Array.isArray(data)) {
+                    // 批量新闻帧，页面只需渲染最后能显示的部分
+                    data.slice(-21).forEach(renderNews);
+                } else if (data.type === 'statistics') {
                     document.getElementById('total-count').textContent = data.data.total_processed;
+                    if (data.data.categories) {
+                        categoryNames = data.data.categories;
+                    }
                     document.getElementById('active-connections').textContent = data.data.active_connections;
                     
                     if (data.data.broadcast_stats) {
@@ -235,26 +338,29 @@ async def get():
                         document.getElementById('avg-batch-size').textContent = data.data.broadcast_stats.avg_batch_size.toFixed(1);
                     }
                 } else {
-                    if (newsContainer.children.length > 20) {
-                        newsContainer.removeChild(newsContainer.lastChild);
-                    }
-                    
-                    const newsDiv = document.createElement('div');
-                    newsDiv.className = 'news-item';
-                    newsDiv.innerHTML = `
-                        <div><strong>${data.title}</strong></div>
-                        <div style="color: #7f8c8d; font-size: 14px;">
-                            ${data.source} | ${data.category} | ⭐ ${data.impact_score}/10
-                        </div>
-                    `;
-                    
-                    newsContainer.insertBefore(newsDiv, newsContainer.firstChild);
+                    renderNews(data);
                 }
             };
         </script>
     </body>
     </html>
-    """)
+    """
+
+# 首页是静态内容，启动时编码并预压缩一次
+_INDEX_BODY = INDEX_HTML.encode()
+_INDEX_GZIP = gzip.compress(_INDEX_BODY)
+_INDEX_ETAG = f'"{hashlib.md5(_INDEX_BODY).hexdigest()}"'
+
+@app.get("/")
+async def get(request: Request):
+    if request.headers.get("if-none-match") == _INDEX_ETAG:
+        return Response(status_code=304, headers={"ETag": _INDEX_ETAG})
+    
+    headers = {"ETag": _INDEX_ETAG, "Cache-Control": "public, max-age=3600", "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=_INDEX_GZIP, media_type="text/html; charset=utf-8", headers=headers)
+    return Response(content=_INDEX_BODY, media_type="text/html; charset=utf-8", headers=headers)
 
 @app.get("/api/stats")
 async def get_statistics():
@@ -263,14 +369,18 @@ async def get_statistics():
 async def main():
     print("🚀 启动持续优化版实时新闻聚合器...")
     
+    asyncio.create_task(broadcaster())
     asyncio.create_task(continuous_news_generator(news_per_second=500))
     
     print("🌐 启动FastAPI服务器...")
     print("📱 访问 http://localhost:8000 查看界面")
     
-    config = uvicorn.Config(app, host="0.0.0.0", port=8000, log_level="info")
+    # 推送的都是小 JSON 帧，关闭 permessage-deflate 省下每帧的 zlib 压缩
+    config = uvicorn.Config(app, host="0.0.0.0", port=8000, log_level="info", ws_per_message_deflate=False)
     server = uvicorn.Server(config)
     await server.serve()
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
@@ -2,18 +2,29 @@
 WebSocket管理器模块
 """
 import asyncio
-import json
 import time
-from typing import List, Dict, Any
-from fastapi import WebSocket, WebSocketDisconnect
+import orjson
+from typing import Set, Dict, Any, List, Tuple
+from fastapi import WebSocket
 from src.utils.config import WS_CONFIG
 
+# news_batch 帧使用列式紧凑格式，字段名每帧只出现一次
+# 只包含页面展示需要的字段，完整新闻可通过 /api/news 获取
+NEWS_BATCH_COLUMNS = ("id", "title", "source", "category", "company", "impact_score", "processed_at", "processing_id")
+
+
+def _news_batch_row(news_item: Dict[str, Any]) -> tuple:
+    """按列顺序取出一条新闻的字段，缺失的可选字段为 None，不影响整帧"""
+    return tuple(news_item.get(column) for column in NEWS_BATCH_COLUMNS)
+
 
 class WebSocketManager:
     """WebSocket连接管理器"""
     
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, backpressure_controller):
+        # 每次实际发送的耗时记入背压控制器的 processing_times
+        self.backpressure_controller = backpressure_controller
+        self.active_connections: Set[WebSocket] = set()
         self.broadcast_stats = {
             'total_sent': 0,
             'total_errors': 0,
@@ -21,59 +32,98 @@ class WebSocketManager:
             'memory_protection_triggers': 0,
             'backpressure_events': 0
         }
+        # 每个连接独立的发送队列和发送任务
+        self.send_queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.send_tasks: Dict[WebSocket, asyncio.Task] = {}
+        # 慢发送汇总日志
+        self.slow_sends = 0
+        self.slow_send_max = 0.0
+        self.last_slow_report = time.monotonic()
     
     async def connect(self, websocket: WebSocket):
-        """接受新连接"""
+        """接受新连接，并为其创建独立的发送队列和发送任务"""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
+        queue = asyncio.Queue(maxsize=WS_CONFIG['client_queue_size'])
+        self.send_queues[websocket] = queue
+        self.send_tasks[websocket] = asyncio.create_task(self._send_loop(websocket, queue))
         print(f"🔌 新连接，当前连接数: {len(self.active_connections)}")
     
     def disconnect(self, websocket: WebSocket):
         """断开连接"""
         if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+            self.active_connections.discard(websocket)
+            self.send_queues.pop(websocket, None)
+            send_task = self.send_tasks.pop(websocket, None)
+            if send_task is not None and send_task is not asyncio.current_task():
+                send_task.cancel()
             print(f"🔌 连接断开，当前连接数: {len(self.active_connections)}")
     
-    async def send_safe(self, websocket: WebSocket, data: Dict[str, Any]) -> Exception:
-        """安全发送消息"""
-        try:
-            message = json.dumps(data, ensure_ascii=False)
-            await websocket.send_text(message)
-            return None
-        except Exception as e:
-            return e
+    async def _send_loop(self, websocket: WebSocket, queue: asyncio.Queue):
+        """连接的发送任务 - 依次发送队列中的消息，慢客户端只会拖慢自己"""
+        while True:
+            message, item_count = await queue.get()
+            start_time = time.monotonic()
+            try:
+                await asyncio.wait_for(websocket.send_text(message), WS_CONFIG['send_timeout'])
+            except Exception:
+                # 发送超时或失败：关闭连接，端点的接收循环随之结束，不留下收不到推送的僵尸连接
+                self.broadcast_stats['total_errors'] += 1
+                try:
+                    await websocket.close(code=1011)
+                except Exception:
+                    pass
+                self.disconnect(websocket)
+                return
+            self.broadcast_stats['total_sent'] += item_count
+            self._record_send_time(time.monotonic() - start_time, queue.qsize())
     
-    async def broadcast_news(self, news_item: Dict[str, Any], backpressure_controller):
-        """安全的新闻广播"""
-        if not self.active_connections:
-            return
-        
-        start_time = time.time()
-        
-        # 创建并发发送任务
-        tasks = []
-        for connection in self.active_connections:
-            tasks.append(self.send_safe(connection, news_item))
-        
-        # 并发执行所有发送任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 统计结果
-        errors = sum(1 for result in results if isinstance(result, Exception))
-        success_count = len(tasks) - errors
+    def _record_send_time(self, send_time: float, backlog: int):
+        """记录一次发送耗时到背压控制器；慢发送（超过10ms）只累计，每秒最多汇总打印一次"""
+        self.backpressure_controller.processing_times.append(send_time)
+        if send_time > 0.01:
+            self.slow_sends += 1
+            self.slow_send_max = max(self.slow_send_max, send_time)
+            now = time.monotonic()
+            if now - self.last_slow_report >= 1.0:
+                print(f"📡 慢发送 {self.slow_sends} 次（{len(self.active_connections)}客户端），最大耗时{self.slow_send_max:.3f}s，该连接积压{backlog}")
+                self.slow_sends = 0
+                self.slow_send_max = 0.0
+                self.last_slow_report = now
+    
+    def _fan_out(self, data: Dict[str, Any], item_count: int = 1) -> Tuple[int, int]:
+        """序列化一次并放入每个连接的发送队列，返回 (入队数, 丢弃数)"""
+        message = (orjson.dumps(data).decode(), item_count)
+        queued = 0
+        dropped = 0
         
-        # 更新统计
-        self.broadcast_stats['total_sent'] += success_count
-        self.broadcast_stats['total_errors'] += errors
+        for queue in self.send_queues.values():
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # 队列已满说明客户端跟不上，丢弃最旧的消息
+                queue.get_nowait()
+                queue.put_nowait(message)
+                dropped += 1
+            queued += 1
         
-        broadcast_time = time.time() - start_time
+        return queued, dropped
+    
+    async def broadcast_news_batch(self, news_items: List[Dict[str, Any]]):
+        """安全的新闻广播 - 多条新闻合并为一个 news_batch 帧"""
+        if not self.active_connections:
+            return
         
-        # 记录处理时间到背压控制器
-        backpressure_controller.processing_times.append(broadcast_time)
+        # 放入各连接的发送队列，实际发送由每个连接的发送任务完成
+        # 送达后按新闻条数计入 total_sent
+        queued, dropped = self._fan_out({
+            "type": "news_batch",
+            "cols": NEWS_BATCH_COLUMNS,
+            "rows": [_news_batch_row(news_item) for news_item in news_items]
+        }, len(news_items))
         
-        # 只在广播时间较长时打印日志
-        if broadcast_time > 0.01:  # 超过10ms才打印
-            print(f"📡 广播1条新闻到{len(self.active_connections)}客户端，耗时{broadcast_time:.3f}s，成功{success_count}，失败{errors}")
+        # 客户端队列满而丢弃的消息计为背压事件
+        self.broadcast_stats['backpressure_events'] += dropped
     
     async def broadcast_statistics(self, statistics: Dict[str, Any]):
         """安全的统计信息广播"""
@@ -83,15 +133,8 @@ class WebSocketManager:
         }
         
         if self.active_connections:
-            tasks = []
-            for connection in self.active_connections:
-                tasks.append(self.send_safe(connection, stats_message))
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            errors = sum(1 for result in results if isinstance(result, Exception))
-            
-            self.broadcast_stats['total_sent'] += (len(tasks) - errors)
-            self.broadcast_stats['total_errors'] += errors
+            queued, dropped = self._fan_out(stats_message)
+            self.broadcast_stats['backpressure_events'] += dropped
     
     def get_stats(self) -> Dict[str, Any]:
         """获取WebSocket统计信息"""
@@ -127,12 +170,11 @@ class WebSocketEndpoint:
             )
             await self.ws_manager.broadcast_statistics(stats)
             
-            # 保持连接
-            while True:
-                await websocket.receive_text()
+            # 保持连接，客户端断开时迭代自然结束
+            async for _ in websocket.iter_text():
+                pass
                 
-        except WebSocketDisconnect:
-            self.ws_manager.disconnect(websocket)
         except Exception as e:
             print(f"❌ WebSocket错误: {e}")
+        finally:
             self.ws_manager.disconnect(websocket)
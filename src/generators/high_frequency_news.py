@@ -42,30 +42,75 @@ class HighFreqNewsGenerator:
             "Market Impact: {company}'s {category} Strategy Reshapes Industry"
         ]
         
+        # 批量采样使用的只读候选表
+        self._sources = tuple(self.news_sources)
+        self._companies = tuple(self.tech_companies)
+        self._categories = tuple(self.news_categories)
+        # 标题模板预转换为 %-格式，避免 str.format 每次重新解析占位符
+        self._templates = tuple(
+            template.replace('{company}', '%(company)s').replace('{category}', '%(category)s')
+            for template in self.templates
+        )
+        
+        # id 前缀在启动时固定一次，之后只拼接递增计数器
+        self._id_prefix = f"news_{int(time.time() * 1000)}_"
+        self._url_prefixes = {
+            source: f"https://{source.lower().replace(' ', '')}.com/news/"
+            for source in self._sources
+        }
+        
         self.counter = 0
     
-    def generate_news_item(self):
-        """生成新闻项"""
+    def _build_news_item(self, now_iso, company, category, source, template, impact_score, word_count, reading_time):
+        """组装单条新闻"""
         self.counter += 1
+        counter = self.counter
         
-        company = random.choice(self.tech_companies)
-        category = random.choice(self.news_categories)
-        source = random.choice(self.news_sources)
-        template = random.choice(self.templates)
-        
-        news_item = {
-            "id": f"news_{int(time.time() * 1000)}_{self.counter}",
-            "timestamp": datetime.now().isoformat(),
+        return {
+            "id": f"{self._id_prefix}{counter}",
+            "timestamp": now_iso,
             "source": source,
-            "title": template.format(company=company, category=category),
-            "summary": f"In-depth analysis of {company}'s latest developments in {category}. This story covers the technical implications, market impact, and future prospects. Story #{self.counter}",
+            "title": template % {"company": company, "category": category},
+            "summary": f"In-depth analysis of {company}'s latest developments in {category}. This story covers the technical implications, market impact, and future prospects. Story #{counter}",
             "category": category,
             "company": company,
-            "impact_score": round(random.uniform(1.0, 10.0), 2),
-            "url": f"https://{source.lower().replace(' ', '')}.com/news/{self.counter}",
-            "author": f"Tech Reporter {self.counter % 10 + 1}",
-            "word_count": random.randint(200, 1500),
-            "reading_time": random.randint(1, 10)
+            "impact_score": impact_score,
+            "url": f"{self._url_prefixes[source]}{counter}",
+            "author": f"Tech Reporter {counter % 10 + 1}",
+            "word_count": word_count,
+            "reading_time": reading_time
         }
+    
+    def generate_news_item(self):
+        """生成新闻项"""
+        return self._build_news_item(
+            datetime.now().isoformat(),
+            random.choice(self._companies),
+            random.choice(self._categories),
+            random.choice(self._sources),
+            random.choice(self._templates),
+            round(random.uniform(1.0, 10.0), 2),
+            random.randint(200, 1500),
+            random.randint(1, 10)
+        )
+    
+    def generate_batch(self, n: int):
+        """批量生成新闻项 - 一次性采样所有随机字段"""
+        rand = random.random
+        companies = random.choices(self._companies, k=n)
+        categories = random.choices(self._categories, k=n)
+        sources = random.choices(self._sources, k=n)
+        templates = random.choices(self._templates, k=n)
+        impact_scores = [round(1.0 + 9.0 * rand(), 2) for _ in range(n)]
+        word_counts = [200 + int(1301 * rand()) for _ in range(n)]
+        reading_times = [1 + int(10 * rand()) for _ in range(n)]
+        
+        # 同一批次共享一次时钟读取
+        now_iso = datetime.now().isoformat()
         
-        return news_item
+        build = self._build_news_item
+        return [
+            build(now_iso, *fields)
+            for fields in zip(companies, categories, sources, templates,
+                              impact_scores, word_counts, reading_times)
+        ]
@@ -1,8 +1,8 @@
 """
 模拟新闻流生成器
 """
-import json
 import time
+import orjson
 import random
 from datetime import datetime
 
@@ -27,16 +27,20 @@ class MockStreamGenerator:
         ]
         
         self.counter = 0
+        self.products = ['AI Model', 'Cloud Service', 'Security Feature', 'Device']
+        
+        # id 前缀在启动时固定一次，之后只拼接递增计数器
+        self._id_prefix = f"news_{int(time.time() * 1000)}_"
     
     def generate_news_item(self):
         """生成新闻项"""
         self.counter += 1
         
         news_item = {
-            "id": f"news_{int(time.time() * 1000)}_{self.counter}",
+            "id": f"{self._id_prefix}{self.counter}",
             "timestamp": datetime.now().isoformat(),
             "source": random.choice(self.news_sources),
-            "title": f"Breaking: {random.choice(self.tech_companies)} Announces Revolutionary {random.choice(['AI Model', 'Cloud Service', 'Security Feature', 'Device'])}",
+            "title": f"Breaking: {random.choice(self.tech_companies)} Announces Revolutionary {random.choice(self.products)}",
             "summary": f"Latest developments in technology sector with focus on innovation and digital transformation. Story #{self.counter}",
             "category": random.choice(self.news_categories),
             "company": random.choice(self.tech_companies),
@@ -45,6 +49,36 @@ class MockStreamGenerator:
         }
         
         return news_item
+    
+    def generate_batch(self, n):
+        """批量生成新闻项 - 各字段一次性采样，整批共用同一个时间戳"""
+        choices = random.choices
+        rand = random.random
+        timestamp = datetime.now().isoformat()
+        
+        title_companies = choices(self.tech_companies, k=n)
+        products = choices(self.products, k=n)
+        sources = choices(self.news_sources, k=n)
+        categories = choices(self.news_categories, k=n)
+        companies = choices(self.tech_companies, k=n)
+        
+        batch = []
+        for title_company, product, source, category, company in zip(
+                title_companies, products, sources, categories, companies):
+            self.counter += 1
+            batch.append({
+                "id": f"{self._id_prefix}{self.counter}",
+                "timestamp": timestamp,
+                "source": source,
+                "title": f"Breaking: {title_company} Announces Revolutionary {product}",
+                "summary": f"Latest developments in technology sector with focus on innovation and digital transformation. Story #{self.counter}",
+                "category": category,
+                "company": company,
+                "impact_score": round(1.0 + 9.0 * rand(), 2),
+                "url": f"https://example.com/news/{self.counter}"
+            })
+        
+        return batch
 
 
 def main():
@@ -58,7 +92,7 @@ def main():
             news_item = generator.generate_news_item()
             
             # 输出JSON格式的新闻
-            print(json.dumps(news_item, ensure_ascii=False))
+            print(orjson.dumps(news_item).decode())
             
             # 每3秒生成一条新闻
             time.sleep(3)
@@ -0,0 +1,23 @@
+"""
+低精度时钟模块
+"""
+import asyncio
+from datetime import datetime
+
+
+class CoarseClock:
+    """低精度时钟 - 后台任务定期刷新缓存的 ISO 时间字符串"""
+
+    def __init__(self, resolution: float = 0.01):
+        self.resolution = resolution  # 刷新间隔(秒)
+        self.now_iso = datetime.now().isoformat()
+
+    def refresh(self):
+        """立即刷新缓存时间"""
+        self.now_iso = datetime.now().isoformat()
+
+    async def run(self):
+        """后台刷新任务"""
+        while True:
+            self.refresh()
+            await asyncio.sleep(self.resolution)
@@ -19,7 +19,9 @@ APP_CONFIG = {
     'version': "1.3.0",
     'host': "0.0.0.0",
     'port': 8000,
-    'log_level': "info"
+    'log_level': "info",
+    'ws_per_message_deflate': False,  # 消息都是小 JSON，压缩的 CPU 开销大于节省的带宽
+    'workers': 1  # uvicorn worker 进程数，>1 时每个进程独立生成新闻并服务自己的连接
 }
 
 # 新闻流配置
@@ -27,7 +29,9 @@ NEWS_CONFIG = {
     'buffer_size': 1000,  # 新闻缓冲区大小
     'test_duration': 30,  # 测试持续时间(秒)
     'news_per_second': 1000,  # 每秒新闻数量
-    'stats_broadcast_interval': 100,  # 每100条新闻广播统计
+    'batch_size': 100,  # 每批生成并处理的新闻数，每批后至多广播一次统计
+    'stats_broadcast_min_interval': 0.5,  # 统计广播最小间隔(秒)
+    'api_news_cache_ttl': 0.1,  # /api/news 响应缓存时间(秒)
     'progress_report_interval': 1000,  # 每1000条新闻打印进度
 }
 
@@ -35,4 +39,7 @@ NEWS_CONFIG = {
 WS_CONFIG = {
     'max_news_display': 20,  # 网页最大显示新闻数量
     'stats_update_interval': 10,  # 统计更新间隔(秒)
+    'send_timeout': 2.0,  # 单个连接发送超时(秒)，超时视为失败并断开
+    'broadcast_batch_size': 100,  # 每个 news_batch 帧最多包含的新闻数
+    'client_queue_size': 64,  # 每个连接的待发送消息队列长度，满时丢弃最旧的消息
 }
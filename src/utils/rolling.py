@@ -0,0 +1,28 @@
+"""
+滑动窗口统计模块
+"""
+from collections import deque
+
+
+class RollingMean:
+    """滑动窗口均值 - 追加时增量维护窗口内的累计和，读取均值为 O(1)"""
+
+    def __init__(self, maxlen: int = 100):
+        self.maxlen = maxlen
+        self.values = deque(maxlen=maxlen)
+        self.total = 0
+
+    def append(self, value):
+        """追加一个样本，窗口已满时先减去将被挤出的最旧样本"""
+        values = self.values
+        if len(values) == self.maxlen:
+            self.total -= values[0]
+        values.append(value)
+        self.total += value
+
+    def mean(self) -> float:
+        """窗口内样本均值，没有样本时为 0"""
+        return self.total / len(self.values) if self.values else 0
+
+    def __len__(self) -> int:
+        return len(self.values)
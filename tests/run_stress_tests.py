@@ -9,7 +9,7 @@ import os
 from datetime import datetime
 from typing import List, Dict, Any
 
-from stress_test_framework import StressTestFramework, TestResult
+from stress_test_framework import StressTestFramework, TestResult, install_uvloop
 from stress_test_config import STRESS_CONFIG
 from test_stress_websocket import WebSocketStressTester
 from test_stress_api import APIStressTester
@@ -361,4 +361,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
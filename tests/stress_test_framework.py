@@ -11,11 +11,17 @@ from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 import psutil
 import aiohttp
+from yarl import URL
 import websockets
 from concurrent.futures import ThreadPoolExecutor
 
 from stress_test_config import STRESS_CONFIG
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # Windows 等平台没有 uvloop，使用默认事件循环
+
 
 @dataclass
 class TestMetrics:
@@ -52,6 +58,31 @@ class TestResult:
     errors: List[str]
 
 
+def summarize_response_times(response_times: List[float]):
+    """响应时间统计 - 只排序一次，均值、最值和分位数都取自排序结果
+    
+    返回 (平均, 最小, 最大, P95, P99)，没有数据时全部为 0
+    """
+    if not response_times:
+        return 0, 0, 0, 0, 0
+    
+    sorted_times = sorted(response_times)
+    count = len(sorted_times)
+    return (
+        statistics.fmean(sorted_times),
+        sorted_times[0],
+        sorted_times[-1],
+        sorted_times[int(count * 0.95)],
+        sorted_times[int(count * 0.99)]
+    )
+
+
+def install_uvloop():
+    """测试脚本入口调用 - 有 uvloop 时将其设为事件循环策略"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 class StressTestFramework:
     """压力测试框架"""
     
@@ -60,6 +91,8 @@ class StressTestFramework:
         self.metrics: List[TestMetrics] = []
         self.logger = self._setup_logger()
         self.process = psutil.Process()
+        # API 请求 URL 按端点缓存，避免每个请求重复拼接和解析
+        self._api_urls: Dict[str, URL] = {}
         
     def _setup_logger(self) -> logging.Logger:
         """设置日志记录器"""
@@ -76,6 +109,16 @@ class StressTestFramework:
         
         return logger
     
+    def create_http_session(self, **kwargs) -> aiohttp.ClientSession:
+        """创建压测用的HTTP会话 - 不限制连接池大小，复用长连接并缓存DNS结果"""
+        connector = aiohttp.TCPConnector(
+            limit=0,
+            limit_per_host=0,
+            ttl_dns_cache=300,
+            keepalive_timeout=75
+        )
+        return aiohttp.ClientSession(connector=connector, **kwargs)
+    
     async def collect_system_metrics(self) -> TestMetrics:
         """收集系统指标"""
         cpu_percent = self.process.cpu_percent()
@@ -91,30 +134,34 @@ class StressTestFramework:
     
     async def monitor_system_resources(self, duration: float, interval: float = 1.0):
         """监控系统资源"""
-        start_time = time.time()
+        deadline = time.monotonic() + duration
         
-        while time.time() - start_time < duration:
+        while time.monotonic() < deadline:
             metrics = await self.collect_system_metrics()
             self.metrics.append(metrics)
             await asyncio.sleep(interval)
     
     async def make_api_request(self, session: aiohttp.ClientSession, endpoint: str) -> TestMetrics:
         """发起API请求"""
-        start_time = time.time()
+        start_time = time.monotonic()
         success = True
         error_message = None
         
+        url = self._api_urls.get(endpoint)
+        if url is None:
+            url = self._api_urls[endpoint] = URL(f"{self.config.base_url}{endpoint}")
+        
         try:
-            async with session.get(f"{self.config.base_url}{endpoint}") as response:
+            async with session.get(url) as response:
                 if response.status != 200:
                     success = False
                     error_message = f"HTTP {response.status}"
-                await response.text()
+                await response.read()
         except Exception as e:
             success = False
             error_message = str(e)
         
-        response_time = time.time() - start_time
+        response_time = time.monotonic() - start_time
         
         # 获取当前系统指标
         system_metrics = await self.collect_system_metrics()
@@ -143,12 +190,13 @@ class StressTestFramework:
         )
         
         # 创建HTTP会话
-        async with aiohttp.ClientSession() as session:
+        async with self.create_http_session() as session:
             tasks = []
             
             async def request_worker():
                 """请求工作器"""
-                while time.time() - (start_time.timestamp() + duration) < 0:
+                deadline = time.monotonic() + duration
+                while time.monotonic() < deadline:
                     # 创建并发请求
                     batch_tasks = []
                     for _ in range(concurrent_requests):
@@ -188,7 +236,7 @@ class StressTestFramework:
         
         async def websocket_client(client_id: int):
             """WebSocket客户端"""
-            connection_start = time.time()
+            deadline = time.monotonic() + duration
             success = True
             error_message = None
             
@@ -196,7 +244,7 @@ class StressTestFramework:
                 async with websockets.connect(self.config.ws_url) as websocket:
                     messages_received = 0
                     
-                    while time.time() - connection_start < duration:
+                    while time.monotonic() < deadline:
                         try:
                             message = await asyncio.wait_for(
                                 websocket.recv(), timeout=1.0
@@ -287,20 +335,12 @@ class StressTestFramework:
         
         # 过滤有效的响应时间指标
         response_times = [m.response_time for m in metrics if m.response_time is not None]
-        successful_requests = len([m for m in metrics if m.success])
+        successful_requests = sum(1 for m in metrics if m.success)
         failed_requests = len(metrics) - successful_requests
         
         # 计算响应时间统计
-        if response_times:
-            avg_response_time = statistics.mean(response_times)
-            min_response_time = min(response_times)
-            max_response_time = max(response_times)
-            sorted_times = sorted(response_times)
-            p95_response_time = sorted_times[int(len(sorted_times) * 0.95)]
-            p99_response_time = sorted_times[int(len(sorted_times) * 0.99)]
-        else:
-            avg_response_time = min_response_time = max_response_time = 0
-            p95_response_time = p99_response_time = 0
+        (avg_response_time, min_response_time, max_response_time,
+         p95_response_time, p99_response_time) = summarize_response_times(response_times)
         
         # 计算系统资源统计
         cpu_values = [m.cpu_percent for m in self.metrics]
@@ -308,8 +348,8 @@ class StressTestFramework:
         
         peak_cpu = max(cpu_values) if cpu_values else 0
         peak_memory = max(memory_values) if memory_values else 0
-        avg_cpu = statistics.mean(cpu_values) if cpu_values else 0
-        avg_memory = statistics.mean(memory_values) if memory_values else 0
+        avg_cpu = statistics.fmean(cpu_values) if cpu_values else 0
+        avg_memory = statistics.fmean(memory_values) if memory_values else 0
         
         # 收集错误信息
         errors = [m.error_message for m in metrics if m.error_message]
@@ -1,5 +1,5 @@
 import asyncio
-import json
+import orjson
 import time
 import random
 import string
@@ -30,7 +30,7 @@ class BackpressureTestGenerator:
             "url": f"https://example.com/news/{self.normal_count}"
         }
         
-        return json.dumps(news, ensure_ascii=False)
+        return orjson.dumps(news).decode()
     
     def generate_oversized_news(self, size_mb: int = 2) -> str:
         """生成超大新闻"""
@@ -52,7 +52,7 @@ class BackpressureTestGenerator:
             "large_content": large_content  # 这个字段会让JSON变得巨大
         }
         
-        return json.dumps(news, ensure_ascii=False)
+        return orjson.dumps(news).decode()
     
     def generate_invalid_json(self) -> str:
         """生成无效JSON"""
@@ -88,7 +88,7 @@ class BackpressureTestGenerator:
         if random.random() > 0.5:
             base_news["category"] = "Missing Category"
         
-        return json.dumps(base_news, ensure_ascii=False)
+        return orjson.dumps(base_news).decode()
     
     def generate_malformed_line(self, line_type: str) -> str:
         """生成畸形行"""
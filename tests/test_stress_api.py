@@ -3,14 +3,16 @@ API端点压力测试
 """
 import asyncio
 import time
-import json
+import orjson
 import logging
+import statistics
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import aiohttp
+from yarl import URL
 from dataclasses import dataclass
 
-from stress_test_framework import StressTestFramework, TestResult
+from stress_test_framework import StressTestFramework, TestResult, summarize_response_times, install_uvloop
 from stress_test_config import STRESS_CONFIG
 
 
@@ -31,6 +33,8 @@ class APIStressTester:
     def __init__(self, framework: StressTestFramework):
         self.framework = framework
         self.logger = logging.getLogger("api_stress_test")
+        # 每个端点的请求 URL 和参数只构建一次，避免每个请求重复拼接和解析
+        self._request_specs: Dict[str, tuple] = {}
         
         # 定义测试端点
         self.endpoints = {
@@ -40,10 +44,28 @@ class APIStressTester:
             "root": APIEndpoint("/"),
         }
     
+    def _request_spec(self, endpoint: APIEndpoint) -> tuple:
+        """获取端点的 (URL, 请求参数)，首次使用时构建并缓存"""
+        spec = self._request_specs.get(endpoint.path)
+        if spec is None:
+            request_kwargs = {
+                'timeout': aiohttp.ClientTimeout(total=endpoint.timeout),
+                'headers': endpoint.headers or {}
+            }
+            
+            if endpoint.method.upper() == 'GET':
+                request_kwargs['params'] = endpoint.params or {}
+            elif endpoint.method.upper() == 'POST':
+                request_kwargs['json'] = endpoint.params or {}
+            
+            spec = (URL(f"{self.framework.config.base_url}{endpoint.path}"), request_kwargs)
+            self._request_specs[endpoint.path] = spec
+        return spec
+    
     async def single_api_request(self, session: aiohttp.ClientSession, 
                                endpoint: APIEndpoint) -> Dict[str, Any]:
         """单个API请求"""
-        start_time = time.time()
+        start_time = time.monotonic()
         result = {
             'endpoint': endpoint.path,
             'method': endpoint.method,
@@ -56,23 +78,10 @@ class APIStressTester:
         }
         
         try:
-            # 构建请求参数
-            request_kwargs = {
-                'timeout': aiohttp.ClientTimeout(total=endpoint.timeout),
-                'headers': endpoint.headers or {}
-            }
-            
-            if endpoint.method.upper() == 'GET':
-                request_kwargs['params'] = endpoint.params or {}
-            elif endpoint.method.upper() == 'POST':
-                request_kwargs['json'] = endpoint.params or {}
+            url, request_kwargs = self._request_spec(endpoint)
             
             # 发起请求
-            async with session.request(
-                endpoint.method,
-                f"{self.framework.config.base_url}{endpoint.path}",
-                **request_kwargs
-            ) as response:
+            async with session.request(endpoint.method, url, **request_kwargs) as response:
                 result['status_code'] = response.status
                 result['content_type'] = response.headers.get('content-type', '')
                 
@@ -89,8 +98,8 @@ class APIStressTester:
                 # 尝试解析JSON
                 if 'application/json' in result['content_type']:
                     try:
-                        json.loads(content.decode('utf-8'))
-                    except json.JSONDecodeError:
+                        orjson.loads(content)
+                    except orjson.JSONDecodeError:
                         result['error'] = "Invalid JSON response"
                 
         except asyncio.TimeoutError:
@@ -100,9 +109,52 @@ class APIStressTester:
         except Exception as e:
             result['error'] = f"Unexpected error: {str(e)}"
         
-        result['response_time'] = time.time() - start_time
+        result['response_time'] = time.monotonic() - start_time
         return result
     
+    async def paced_api_requests(self, session: aiohttp.ClientSession,
+                                 endpoint: APIEndpoint,
+                                 concurrent_requests: int,
+                                 duration: float,
+                                 request_results: List[Dict[str, Any]]):
+        """按目标速率持续发起请求 - 最多 concurrent_requests 个同时在途，不等整批完成"""
+        # 目标速率与原先一致：每个请求间隔内发出 concurrent_requests 个请求
+        interval = self.framework.config.api_request_interval / concurrent_requests
+        semaphore = asyncio.Semaphore(concurrent_requests)
+        loop = asyncio.get_running_loop()
+        # 只保留在途任务，完成后自动移除，长时间运行时任务对象不会累积
+        tasks = set()
+        
+        async def one_request():
+            try:
+                request_results.append(await self.single_api_request(session, endpoint))
+            finally:
+                semaphore.release()
+        
+        start = loop.time()
+        deadline = start + duration
+        i = 0
+        while True:
+            # 按预先计算的时间表发出第 i 个请求，落后时直接补发
+            scheduled = start + i * interval
+            if scheduled >= deadline:
+                break
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # 在途请求数已满时在这里等待，服务端变慢不会无限堆积任务
+            await semaphore.acquire()
+            if loop.time() >= deadline:
+                semaphore.release()
+                break
+            task = asyncio.create_task(one_request())
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            i += 1
+        
+        # 只需等待截止时仍在途的请求
+        await asyncio.gather(*tasks)
+    
     async def concurrent_api_test(self, endpoint_name: str, 
                                 concurrent_requests: int = None,
                                 duration: int = None) -> TestResult:
@@ -126,51 +178,10 @@ class APIStressTester:
         )
         
         # 创建HTTP会话
-        connector = aiohttp.TCPConnector(
-            limit=concurrent_requests * 2,  # 连接池大小
-            limit_per_host=concurrent_requests,
-            keepalive_timeout=30,
-            enable_cleanup_closed=True
-        )
-        
         timeout = aiohttp.ClientTimeout(total=endpoint.timeout)
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            async def request_worker():
-                """请求工作器"""
-                while time.time() - (start_time + duration) < 0:
-                    # 创建并发请求批次
-                    batch_tasks = []
-                    for _ in range(concurrent_requests):
-                        task = asyncio.create_task(
-                            self.single_api_request(session, endpoint)
-                        )
-                        batch_tasks.append(task)
-                    
-                    # 等待批次完成
-                    batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                    
-                    # 处理结果
-                    for result in batch_results:
-                        if isinstance(result, dict):
-                            request_results.append(result)
-                        elif isinstance(result, Exception):
-                            request_results.append({
-                                'endpoint': endpoint.path,
-                                'method': endpoint.method,
-                                'status_code': None,
-                                'response_time': 0,
-                                'success': False,
-                                'error': f"Request exception: {str(result)}",
-                                'response_size': 0,
-                                'content_type': None
-                            })
-                    
-                    # 请求间隔
-                    await asyncio.sleep(self.framework.config.api_request_interval)
-            
-            # 启动请求工作器
-            await request_worker()
+        async with self.framework.create_http_session(timeout=timeout) as session:
+            await self.paced_api_requests(session, endpoint, concurrent_requests, duration, request_results)
         
         # 等待系统监控完成
         await monitor_task
@@ -205,12 +216,12 @@ class APIStressTester:
             self.framework.monitor_system_resources(total_duration)
         )
         
-        connector = aiohttp.TCPConnector(limit=max_concurrent * 2, limit_per_host=max_concurrent)
         timeout = aiohttp.ClientTimeout(total=endpoint.timeout)
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async with self.framework.create_http_session(timeout=timeout) as session:
             async def ramp_worker():
                 """递增负载工作器"""
+                ramp_start = time.monotonic()
                 elapsed = 0
                 
                 while elapsed < total_duration:
@@ -250,7 +261,7 @@ class APIStressTester:
                     
                     # 等待下一个周期
                     await asyncio.sleep(1.0)
-                    elapsed = time.time() - start_time
+                    elapsed = time.monotonic() - ramp_start
             
             await ramp_worker()
         
@@ -285,42 +296,10 @@ class APIStressTester:
             self.framework.monitor_system_resources(duration)
         )
         
-        connector = aiohttp.TCPConnector(limit=concurrent_requests * 2, limit_per_host=concurrent_requests)
         timeout = aiohttp.ClientTimeout(total=endpoint.timeout)
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            async def endurance_worker():
-                """耐久性测试工作器"""
-                while time.time() - (start_time + duration) < 0:
-                    # 发起请求
-                    tasks = []
-                    for _ in range(concurrent_requests):
-                        task = asyncio.create_task(
-                            self.single_api_request(session, endpoint)
-                        )
-                        tasks.append(task)
-                    
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    for result in results:
-                        if isinstance(result, dict):
-                            request_results.append(result)
-                        elif isinstance(result, Exception):
-                            request_results.append({
-                                'endpoint': endpoint.path,
-                                'method': endpoint.method,
-                                'status_code': None,
-                                'response_time': 0,
-                                'success': False,
-                                'error': f"Request exception: {str(result)}",
-                                'response_size': 0,
-                                'content_type': None
-                            })
-                    
-                    # 请求间隔
-                    await asyncio.sleep(self.framework.config.api_request_interval)
-            
-            await endurance_worker()
+        async with self.framework.create_http_session(timeout=timeout) as session:
+            await self.paced_api_requests(session, endpoint, concurrent_requests, duration, request_results)
         
         # 等待系统监控完成
         await monitor_task
@@ -337,26 +316,16 @@ class APIStressTester:
     def _calculate_api_test_result(self, test_name: str, start_time: datetime, 
                                   end_time: datetime, request_results: List[Dict]) -> TestResult:
         """计算API测试结果"""
-        duration = end_time - start_time
+        duration = (end_time - start_time).total_seconds()
         
         # 统计请求结果
-        successful_requests = len([r for r in request_results if r['success']])
+        successful_requests = sum(1 for r in request_results if r['success'])
         failed_requests = len(request_results) - successful_requests
         
         # 响应时间统计
         response_times = [r['response_time'] for r in request_results if r['response_time'] > 0]
-        
-        if response_times:
-            import statistics
-            avg_response_time = statistics.mean(response_times)
-            min_response_time = min(response_times)
-            max_response_time = max(response_times)
-            sorted_times = sorted(response_times)
-            p95_response_time = sorted_times[int(len(sorted_times) * 0.95)]
-            p99_response_time = sorted_times[int(len(sorted_times) * 0.99)]
-        else:
-            avg_response_time = min_response_time = max_response_time = 0
-            p95_response_time = p99_response_time = 0
+        (avg_response_time, min_response_time, max_response_time,
+         p95_response_time, p99_response_time) = summarize_response_times(response_times)
         
         # 系统资源统计
         cpu_values = [m.cpu_percent for m in self.framework.metrics]
@@ -364,8 +333,8 @@ class APIStressTester:
         
         peak_cpu = max(cpu_values) if cpu_values else 0
         peak_memory = max(memory_values) if memory_values else 0
-        avg_cpu = statistics.mean(cpu_values) if cpu_values else 0
-        avg_memory = statistics.mean(memory_values) if memory_values else 0
+        avg_cpu = statistics.fmean(cpu_values) if cpu_values else 0
+        avg_memory = statistics.fmean(memory_values) if memory_values else 0
         
         # 收集错误信息
         errors = [r['error'] for r in request_results if r.get('error')]
@@ -463,4 +432,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
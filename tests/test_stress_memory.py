@@ -12,7 +12,7 @@ from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
-from stress_test_framework import StressTestFramework, TestResult
+from stress_test_framework import StressTestFramework, TestResult, install_uvloop
 from stress_test_config import STRESS_CONFIG
 
 
@@ -458,4 +458,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
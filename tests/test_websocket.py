@@ -1,11 +1,13 @@
 import asyncio
-import json
 import time
+import orjson
 import websockets
 import statistics
 from datetime import datetime
 from typing import List, Dict, Any
 
+from stress_test_framework import install_uvloop
+
 class WebSocketFixTester:
     def __init__(self, ws_url="ws://localhost:8000/ws"):
         self.ws_url = ws_url
@@ -25,14 +27,19 @@ class WebSocketFixTester:
             async with websockets.connect(self.ws_url) as websocket:
                 print(f"🔌 修复测试客户端 {client_id} 已连接")
                 
-                start_time = time.time()
+                start_time = time.monotonic()
+                deadline = start_time + duration
                 last_message_time = start_time
                 message_count = 0
+                # 收到的新闻和统计只计数，每秒汇总打印一次
+                news_count = 0
+                stats_count = 0
+                last_log = start_time
                 
-                while time.time() - start_time < duration:
+                while time.monotonic() < deadline:
                     try:
                         message = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                        current_time = time.time()
+                        current_time = time.monotonic()
                         
                         self.results['websocket_messages'] += 1
                         message_count += 1
@@ -44,8 +51,10 @@ class WebSocketFixTester:
                         
                         # 解析消息类型
                         try:
-                            data = json.loads(message)
-                            if data.get('type') == 'statistics':
+                            data = orjson.loads(message)
+                            if data.get('type') == 'news_batch':
+                                news_count += len(data.get('rows', []))
+                            elif data.get('type') == 'statistics':
                                 # 提取广播统计信息
                                 if 'broadcast_stats' in data.get('data', {}):
                                     self.results['broadcast_stats'] = data['data']['broadcast_stats']
@@ -59,22 +68,34 @@ class WebSocketFixTester:
                                     }
                                     self.results['performance_samples'].append(performance_sample)
                                     
-                                print(f"📊 客户端 {client_id} 收到统计更新")
+                                stats_count += 1
                             else:
-                                print(f"📰 客户端 {client_id} 收到新闻: {data.get('title', 'Unknown')[:30]}...")
+                                news_count += 1
                                 
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             print(f"⚠️ 客户端 {client_id} 收到非JSON消息")
                             
                     except asyncio.TimeoutError:
-                        continue
+                        # 推送停顿时也检查汇总计时，停顿前的计数按时输出，持续停顿时输出 0 条
+                        pass
                     except Exception as e:
                         self.results['websocket_errors'] += 1
                         print(f"❌ WebSocket客户端 {client_id} 错误: {e}")
                         break
+                    
+                    now = time.monotonic()
+                    if now - last_log >= 1.0:
+                        print(f"📰 客户端 {client_id}: 收到新闻 {news_count} 条，统计更新 {stats_count} 次")
+                        news_count = 0
+                        stats_count = 0
+                        last_log = now
+                
+                # 输出最后不足一秒的计数
+                if news_count or stats_count:
+                    print(f"📰 客户端 {client_id}: 收到新闻 {news_count} 条，统计更新 {stats_count} 次")
                         
                 # 输出客户端统计
-                elapsed = time.time() - start_time
+                elapsed = time.monotonic() - start_time
                 rate = message_count / elapsed if elapsed > 0 else 0
                 print(f"📊 客户端 {client_id} 完成: {message_count} 消息, {rate:.2f} 消息/秒")
                         
@@ -223,4 +244,5 @@ async def main():
         print(f"❌ 测试失败: {e}")
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())